@@ -2,11 +2,486 @@
 This class is responsible for storing all the information about the current state of the puzzle. It will also be
 responsible for determining the next moves using one of the algorithms. It will also keep a moves log.
 """
+import heapq
+import json
+import math
+import mmap
+import operator
+import os
+import pickle
 import random
+import time
+from array import array
+
+# Genetic algorithm parameters that a tuned preset is allowed to override.
+PRESET_KEYS = ['crossover', 'crossover_rate', 'mutation_rate', 'recombination', 'population_size', 'n_generations']
+
+
+"""
+Responsible for loading a tuned genetic algorithm preset into the puzzle variables.
+"""
+
+
+def load_preset(path, puzzle_variables):
+    with open(path) as f:
+        preset = json.load(f)
+    for key in PRESET_KEYS:
+        if key in preset:
+            puzzle_variables[key] = preset[key]
+    return puzzle_variables
+
+
+"""
+Responsible for building a valid board for N = 1 or any N >= 4 in linear time using the explicit construction: even rows
+followed by odd rows, with the N mod 6 == 2 and N mod 6 == 3 families patched as in Hoffman, Loessi and Moser.
+The rows are written directly into the given board (a list or array of length N), so no extra memory is used.
+"""
+
+
+def explicit_solution(dimensions, board=None):
+    if dimensions in (2, 3):
+        raise ValueError('There is no solution for N = {}'.format(dimensions))
+    if board is None:
+        board = [0] * dimensions
+    n_evens = dimensions // 2
+    n_odds = dimensions - n_evens
+    for col in range(dimensions):
+        # Rows are computed 1-based as in the construction and stored 0-based.
+        if col < n_evens:
+            j = col
+            if dimensions % 6 == 3:
+                row = 2 if j == n_evens - 1 else 2 * j + 4
+            else:
+                row = 2 * j + 2
+        else:
+            j = col - n_evens
+            if dimensions % 6 == 2:
+                if j == 0:
+                    row = 3
+                elif j == 1:
+                    row = 1
+                elif j == n_odds - 1:
+                    row = 5
+                else:
+                    row = 2 * j + 3
+            elif dimensions % 6 == 3:
+                if j == n_odds - 2:
+                    row = 1
+                elif j == n_odds - 1:
+                    row = 3
+                else:
+                    row = 2 * j + 5
+            else:
+                row = 2 * j + 1
+        board[col] = row - 1
+    return board
+
+
+"""
+Responsible for verifying a board in O(N) using row and diagonal occupancy arrays.
+Returns None for a solution, otherwise the first conflicting pair as ((col, row), (col, row)). A queen outside the
+board is reported as ((col, row), None).
+"""
+
+
+def find_conflict(board):
+    dimensions = len(board)
+    if dimensions == 0:
+        return None
+    # Fast path: the differences and sums are computed by map() in C, so a valid board never enters the Python loop.
+    in_range = 0 <= min(board) and max(board) < dimensions
+    if in_range and len(set(board)) == dimensions and \
+            len(set(map(operator.sub, board, range(dimensions)))) == dimensions and \
+            len(set(map(operator.add, board, range(dimensions)))) == dimensions:
+        return None
+
+    rows = [-1] * dimensions
+    diagonals = [-1] * (2 * dimensions - 1)
+    anti_diagonals = [-1] * (2 * dimensions - 1)
+    for col, row in enumerate(board):
+        if not 0 <= row < dimensions:
+            return (col, row), None
+        for occupancy, idx in ((rows, row), (diagonals, row - col + dimensions - 1), (anti_diagonals, row + col)):
+            if occupancy[idx] != -1:
+                return (occupancy[idx], board[occupancy[idx]]), (col, row)
+            occupancy[idx] = col
+    return None
+
+
+"""
+Responsible for verifying many boards. Yields (index, conflict) for every board that is not a solution.
+"""
+
+
+def verify_boards(boards):
+    for idx, board in enumerate(boards):
+        conflict = find_conflict(board)
+        if conflict is not None:
+            yield idx, conflict
+
+
+# Reported by verify_board_file for trailing bytes that do not make up a whole board.
+PARTIAL_RECORD = 'partial record'
+
+
+"""
+Responsible for verifying a binary file of boards without loading it into memory. The file is memory-mapped and
+each board is read as N consecutive rows of the given array typecode ('B' for N <= 256, 'H' above).
+Trailing bytes that do not make up a whole board are reported as (index, PARTIAL_RECORD).
+"""
+
+
+def verify_board_file(path, dimensions, typecode='B'):
+    record_size = array(typecode).itemsize * dimensions
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        n_boards = size // record_size
+        if n_boards:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                rows = memoryview(mm)[:n_boards * record_size].cast(typecode)
+                try:
+                    boards = (rows[start:start + dimensions].tolist() for start in range(0, len(rows), dimensions))
+                    for idx, conflict in verify_boards(boards):
+                        yield idx, conflict
+                finally:
+                    rows.release()
+        if size % record_size:
+            yield n_boards, PARTIAL_RECORD
+
+
+"""
+Responsible for signalling that the fixed queens of a completion attack each other or leave no solution.
+"""
+
+
+class InfeasiblePlacement(ValueError):
+    pass
+
+
+"""
+Responsible for completing a board in which some queens are already placed. fixed_queens is a list of (col, row)
+pairs. The free columns start with a bitmask domain of the rows not attacked by the fixed queens; small boards are
+then solved by backtracking with forward checking and large boards by min-conflicts local search that never moves
+the fixed queens. Returns the completed board. Raises InfeasiblePlacement when the fixed queens cannot be part of any
+solution, and returns None when the local search runs out of max_steps without settling it either way.
+"""
+
+
+def complete_board(dimensions, fixed_queens, rng=None, backtrack_limit=40, max_steps=None):
+    if rng is None:
+        rng = random.Random()
+
+    board = [-1] * dimensions
+    for col, row in fixed_queens:
+        if not 0 <= col < dimensions or not 0 <= row < dimensions:
+            raise ValueError('Queen ({}, {}) is outside the board'.format(col, row))
+        if board[col] != -1 and board[col] != row:
+            raise InfeasiblePlacement('Two queens are pinned in column {}'.format(col))
+        board[col] = row
+
+    fixed_cols = [col for col in range(dimensions) if board[col] != -1]
+
+    # Fail fast when the fixed queens attack each other.
+    rows = set()
+    diagonals = set()
+    anti_diagonals = set()
+    for col in fixed_cols:
+        row = board[col]
+        if row in rows or row - col in diagonals or row + col in anti_diagonals:
+            raise InfeasiblePlacement('The pinned queens attack each other')
+        rows.add(row)
+        diagonals.add(row - col)
+        anti_diagonals.add(row + col)
+
+    domains = [(1 << dimensions) - 1] * dimensions
+    for col in fixed_cols:
+        domains[col] = 1 << board[col]
+    for col in fixed_cols:
+        domains = prune_domains(domains, board, col, board[col])
+        if domains is None:
+            raise InfeasiblePlacement('The pinned queens attack every row of a free column')
+
+    if dimensions <= backtrack_limit:
+        # Backtracking is exhaustive, so not finding a board proves there is none.
+        if backtrack_completion(domains, board) is None:
+            raise InfeasiblePlacement('The pinned queens are not part of any solution')
+        return board
+    return local_search_completion(domains, board, rng, max_steps or 100 * dimensions)
+
+
+"""
+Responsible for removing the rows attacked by a queen at (col, row) from the domains of the free columns.
+Returns the new domains, or None when a free column is left without any row.
+"""
+
+
+def prune_domains(domains, board, col, row):
+    dimensions = len(domains)
+    pruned = list(domains)
+    for other in range(dimensions):
+        if board[other] != -1 or other == col:
+            continue
+        distance = abs(other - col)
+        attacked = 1 << row
+        if row + distance < dimensions:
+            attacked |= 1 << (row + distance)
+        if row - distance >= 0:
+            attacked |= 1 << (row - distance)
+        pruned[other] &= ~attacked
+        if pruned[other] == 0:
+            return None
+    return pruned
+
+
+def backtrack_completion(domains, board):
+    free = [col for col in range(len(board)) if board[col] == -1]
+    if not free:
+        return board
+
+    # Branch on the free column with the fewest rows left.
+    col = min(free, key=lambda c: bin(domains[c]).count('1'))
+    options = domains[col]
+    while options:
+        bit = options & -options
+        options ^= bit
+        row = bit.bit_length() - 1
+        pruned = prune_domains(domains, board, col, row)
+        if pruned is None:
+            continue
+        board[col] = row
+        if backtrack_completion(pruned, board) is not None:
+            return board
+        board[col] = -1
+    return None
+
+
+def local_search_completion(domains, board, rng, max_steps):
+    dimensions = len(board)
+    free = [col for col in range(dimensions) if board[col] == -1]
+    rows = [0] * dimensions
+    diagonals = [0] * (2 * dimensions - 1)
+    anti_diagonals = [0] * (2 * dimensions - 1)
+
+    def place(col, row, amount):
+        rows[row] += amount
+        diagonals[row - col + dimensions - 1] += amount
+        anti_diagonals[row + col] += amount
+
+    def attacks(col, row):
+        return rows[row] + diagonals[row - col + dimensions - 1] + anti_diagonals[row + col]
+
+    def best_row(col):
+        best = []
+        best_attacks = None
+        options = domains[col]
+        while options:
+            bit = options & -options
+            options ^= bit
+            row = bit.bit_length() - 1
+            n = attacks(col, row)
+            if best_attacks is None or n < best_attacks:
+                best = [row]
+                best_attacks = n
+            elif n == best_attacks:
+                best.append(row)
+        return rng.choice(best)
+
+    for col in range(dimensions):
+        if board[col] != -1:
+            place(col, board[col], 1)
+    rng.shuffle(free)
+    for col in free:
+        board[col] = best_row(col)
+        place(col, board[col], 1)
+
+    steps = 0
+    while steps < max_steps:
+        # Every queen counts itself once on its row and on each diagonal.
+        conflicted = [col for col in free if attacks(col, board[col]) > 3]
+        if not conflicted:
+            return board
+        for _ in range(len(conflicted)):
+            col = rng.choice(conflicted)
+            place(col, board[col], -1)
+            board[col] = best_row(col)
+            place(col, board[col], 1)
+            steps += 1
+    return None
+
+
+"""
+Responsible for mapping a board to the smallest board reachable with the 4 symmetries that keep every queen in a
+column: the row flip, the column flip and the half turn. These map a one square move of a queen within its column to
+another such move, so they are symmetries of the search space and safe for the best-first closed set.
+"""
+
+
+def column_canonical_board(board):
+    dimensions = len(board)
+    board = tuple(board)
+    flipped = tuple(dimensions - 1 - row for row in board)
+    return min(board, board[::-1], flipped, flipped[::-1])
+
+
+"""
+Responsible for mapping a board to the smallest board of its symmetry class in O(N). Boards with one queen per row
+have all 8 symmetries of the square; any other board only keeps the 4 of column_canonical_board. The transpose
+turns moves within a column into moves within a row, so this form is for deduplicating solutions only.
+"""
+
+
+def canonical_board(board):
+    dimensions = len(board)
+    key = column_canonical_board(board)
+    if len(set(board)) == dimensions:
+        # The transpose of a permutation board is its inverse permutation.
+        transposed = [0] * dimensions
+        for col, row in enumerate(board):
+            transposed[row] = col
+        key = min(key, column_canonical_board(transposed))
+    return key
+
+
+"""
+Responsible for removing the boards that are symmetric to an earlier board in the list.
+"""
+
+
+def unique_solutions(boards):
+    seen = set()
+    unique = []
+    for board in boards:
+        key = canonical_board(board)
+        if key not in seen:
+            seen.add(key)
+            unique.append(board)
+    return unique
+
+
+"""
+Responsible for enumerating every solution with bitmask backtracking. With unique=True only the canonical board of
+each symmetry class is yielded. The canonical board starts with the smallest of the 8 first rows of its images, and
+those are the distances of the four edge queens from their corners. So with the first queen in row r, no queen may
+sit within r of a corner on the top or bottom edge, and the last queen is limited to rows r to N-1-r. This prunes
+the subtrees whose solutions cannot be canonical, and the few non-canonical solutions left are filtered with
+canonical_board(). Most of the search tree lies below first rows near the middle, where these bounds prune little,
+so this is only 2 to 3 times faster than the full enumeration for N from 8 to 13, not 8 times.
+"""
+
+
+def enumerate_solutions(dimensions, unique=False):
+    full = (1 << dimensions) - 1
+    board = [0] * dimensions
+
+    def place(col, rows, diagonals, anti_diagonals):
+        if col == dimensions:
+            yield list(board)
+            return
+        options = full & ~(rows | diagonals | anti_diagonals)
+        if unique:
+            if col == 0:
+                options &= (1 << ((dimensions + 1) // 2)) - 1
+            else:
+                first = board[0]
+                if col < first or col > dimensions - 1 - first:
+                    options &= ~(1 | 1 << (dimensions - 1))
+                if col == dimensions - 1:
+                    options &= ((1 << (dimensions - first)) - 1) & ~((1 << first) - 1)
+        while options:
+            bit = options & -options
+            options ^= bit
+            board[col] = bit.bit_length() - 1
+            for solution in place(col + 1, rows | bit, ((diagonals | bit) << 1) & full, (anti_diagonals | bit) >> 1):
+                yield solution
+
+    for solution in place(0, 0, 0, 0):
+        if not unique or canonical_board(solution) == tuple(solution):
+            yield solution
+
+
+"""
+Responsible for indexing a population by its exact boards. Membership tests are O(1) hash lookups, and the per column
+row counts give the diversity of the population without scanning it.
+"""
+
+
+class PopulationIndex:
+    def __init__(self, dimensions, boards=()):
+        self.dimensions = dimensions
+        self.boards = {}
+        self.gene_counts = [[0] * dimensions for _ in range(dimensions)]
+        self.size = 0
+        for board in boards:
+            self.add(board)
+
+    def __contains__(self, board):
+        return tuple(board) in self.boards
+
+    def add(self, board):
+        key = tuple(board)
+        self.boards[key] = self.boards.get(key, 0) + 1
+        for col, row in enumerate(board):
+            self.gene_counts[col][row] += 1
+        self.size += 1
+
+    def remove(self, board):
+        key = tuple(board)
+        if self.boards[key] == 1:
+            del self.boards[key]
+        else:
+            self.boards[key] -= 1
+        for col, row in enumerate(board):
+            self.gene_counts[col][row] -= 1
+        self.size -= 1
+
+    """
+      Responsible for the mean Shannon entropy, in bits, of the rows chosen for each column.
+    """
+
+    def gene_entropy(self):
+        if self.size == 0:
+            return 0
+        entropy = 0
+        for counts in self.gene_counts:
+            for count in counts:
+                if count:
+                    probability = count / self.size
+                    entropy -= probability * math.log2(probability)
+        return entropy / self.dimensions
+
+    def stats(self):
+        return {'unique': len(self.boards), 'gene_entropy': self.gene_entropy()}
+
+
+# Attributes written to a checkpoint as they are. The A* log goes to a separate file and the indexes derived from the
+# log and the population are rebuilt on resume.
+CHECKPOINT_ATTRIBUTES = ['board', 'population', 'fitted_population', 'generation_count', 'g_n', 'search_path',
+                         'search_stats']
 
 
 class PuzzleState:
     def __init__(self, puzzle_variables):
+        self.reset_state(puzzle_variables)
+        if puzzle_variables.get('Algorithm') == 'Explicit':
+            # The explicit construction needs neither a population nor a random board.
+            self.board = explicit_solution(self.dimensions)
+            return
+        if puzzle_variables.get('Algorithm') in (None, 'Genetic'):
+            # Only the genetic algorithm uses a population.
+            self.initialize_generation()
+            self.determine_fitness()
+            self.fitted_population.sort()
+        if puzzle_variables.get('initial_board') == 'Explicit':
+            self.board = explicit_solution(self.dimensions)
+        else:
+            for i in range(self.dimensions):
+                self.board.append(self.rng.randint(0, self.dimensions - 1))
+
+    """
+    Responsible for setting every attribute of an empty puzzle state. Shared by __init__ and load_checkpoint.
+    """
+
+    def reset_state(self, puzzle_variables):
         # Board containing the initial positions of the queens.
         # Each column would contain only one queen.
         # The row positions will be generated randomly.
@@ -14,64 +489,37 @@ class PuzzleState:
         self.puzzle_variables = puzzle_variables
         self.board = []
         self.log = []
+        # Number of log entries already written to the checkpoint log file.
+        self.log_saved = 0
+        # The boards in the log as tuples, so the greedy A* tabu check is a hash lookup instead of a list scan.
+        # Exact boards are kept: a mirror image of a visited board is a different move for the greedy search.
+        self.visited = set()
         self.population = []
         self.fitted_population = []
         self.generation_count = 0
         self.g_n = 0
-        self.initialize_generation()
-        self.determine_fitness()
-        self.fitted_population.sort()
-        for i in range(self.dimensions):
-            self.board.append(random.randint(0, self.dimensions - 1))
+        # Hash index of the population and the diversity statistics of the current generation.
+        self.population_index = PopulationIndex(self.dimensions)
+        self.generation_stats = {}
+        # Running informed search, the boards it still has to show and the statistics of the last search.
+        self.search = None
+        self.search_path = None
+        self.search_stats = {}
+        # Each puzzle owns its random generator so that a run can be reproduced from a seed and resumed from a
+        # checkpoint without being disturbed by anything else using the random module.
+        self.rng = random.Random(puzzle_variables.get('seed'))
 
     """
-    Responsible for checking if a queen is safe or not.
+      Responsible for rebuilding the visited set and the population index after the log and population are restored.
     """
 
-    def q_is_safe(self, row, col):
-        # Check the lower right diagonal for possible attacks
-        i = 1
-        while row + i < self.dimensions and col + i < self.dimensions:
-            if self.board[col + i] == row + i:
-                return False
-            i += 1
-
-        # Check the upper left diagonal for possible attacks
-        i = 1
-        while row - i > -1 and col - i > -1:
-            if self.board[col - i] == row - i:
-                return False
-            i += 1
-
-        # Check the upper right diagonal for possible attacks
-        i = 1
-        while row - i > -1 and col + i < self.dimensions:
-            if self.board[col + i] == row - i:
-                return False
-            i += 1
-
-        # Check the lower left diagonal for possible attacks
-        i = 1
-        while row + i < self.dimensions and col - i > -1:
-            if self.board[col - i] == row + i:
-                return False
-            i += 1
-
-        # Check the right row for possible attacks
-        i = 1
-        while col + i < self.dimensions:
-            if self.board[col + i] == row:
-                return False
-            i += 1
-
-        # Check the left row for possible attacks
-        i = 1
-        while col - i > -1:
-            if self.board[col - i] == row:
-                return False
-            i += 1
-
-        return True
+    def rebuild_indexes(self):
+        self.visited = set()
+        for board in self.log:
+            self.visited.add(tuple(board))
+        self.population_index = PopulationIndex(self.dimensions, self.population)
+        if self.population:
+            self.generation_stats = self.population_index.stats()
 
     """
       Responsible for calculating the number of attacks on a queen.
@@ -200,18 +648,13 @@ class PuzzleState:
                     else:
                         temp_board.append(row)
 
-                if temp_board in self.log:
+                if tuple(temp_board) in self.visited:
                     i += 1
                 else:
                     break
             else:
                 break
-        n_q_save = 0
-        for col, row in enumerate(self.board):
-            if self.q_is_safe(row, col):
-                n_q_save += 1
-
-        if n_q_save == self.dimensions:
+        if find_conflict(self.board) is None:
             solved = True
         elif i < self.dimensions:
             selected_q = queue[i]
@@ -219,27 +662,289 @@ class PuzzleState:
             for row in self.board:
                 prev_board.append(row)
             self.log.append(prev_board)
+            self.visited.add(tuple(prev_board))
             if selected_q[2] == 'up' and self.board[int(selected_q[1])] - 1 > -1:
                 self.board[int(selected_q[1])] -= 1
             elif selected_q[2] == 'down' and self.board[int(selected_q[1])] + 1 < self.dimensions:
                 self.board[int(selected_q[1])] += 1
 
+        if self.checkpoint_due(self.g_n):
+            self.save_checkpoint(self.puzzle_variables['checkpoint_path'])
+
         return solved
 
+    """
+      Responsible for counting the number of attacking pairs on a board using row and diagonal occupancy counts.
+    """
+
+    def count_conflicts(self, board):
+        rows = [0] * self.dimensions
+        diagonals = [0] * (2 * self.dimensions - 1)
+        anti_diagonals = [0] * (2 * self.dimensions - 1)
+        conflicts = 0
+        for col, row in enumerate(board):
+            d = row - col + self.dimensions - 1
+            a = row + col
+            conflicts += rows[row] + diagonals[d] + anti_diagonals[a]
+            rows[row] += 1
+            diagonals[d] += 1
+            anti_diagonals[a] += 1
+        return conflicts
+
+    """
+      Responsible for generating the boards reachable by moving a single queen one square up or down.
+    """
+
+    def neighbours(self, board):
+        for col, row in enumerate(board):
+            if row > 0:
+                yield board[:col] + (row - 1,) + board[col + 1:]
+            if row + 1 < self.dimensions:
+                yield board[:col] + (row + 1,) + board[col + 1:]
+
+    """
+      Responsible for applying best-first A* search with a heap based open list keyed on f = g + h and a hashed
+      closed set. Falls back to IDA* when the number of stored nodes exceeds the 'memory_limit' puzzle variable.
+      A 'heuristic_weight' above 1 trades optimal paths for far fewer expanded nodes.
+    """
+
+    def best_first_search(self):
+        self.start_search(self.best_first_steps())
+        self.advance_search()
+        return self.search_path
+
+    """
+      Responsible for applying IDA* search. Memory is bounded by the depth of the current path.
+    """
+
+    def ida_star_search(self):
+        self.start_search(self.ida_star_steps())
+        self.advance_search()
+        return self.search_path
+
+    """
+      Responsible for the best-first A* search itself. It yields after every expanded node so that the search can be
+      run in slices, and stores the found path in search_path when it finishes.
+    """
+
+    def best_first_steps(self):
+        memory_limit = self.puzzle_variables.get('memory_limit')
+        weight = self.puzzle_variables.get('heuristic_weight', 1)
+        start = tuple(self.board)
+        tie = 0
+        open_list = [(weight * self.count_conflicts(start), 0, tie, start)]
+        parents = {start: None}
+        g_scores = {start: 0}
+        # Closed boards are stored by column canonical form, so a mirror image of an expanded board is not expanded.
+        closed = set()
+        path = None
+
+        while open_list:
+            f_n, g_n, _, board = heapq.heappop(open_list)
+            key = column_canonical_board(board)
+            if key in closed:
+                continue
+            if f_n == g_n:
+                # h = 0 means no queen is under attack.
+                path = []
+                while board is not None:
+                    path.append(list(board))
+                    board = parents[board]
+                path.reverse()
+                break
+
+            closed.add(key)
+            self.search_stats['nodes_expanded'] += 1
+            for child in self.neighbours(board):
+                if column_canonical_board(child) in closed or g_scores.get(child, g_n + 2) <= g_n + 1:
+                    continue
+                g_scores[child] = g_n + 1
+                parents[child] = board
+                tie += 1
+                heapq.heappush(open_list, (g_n + 1 + weight * self.count_conflicts(child), g_n + 1, tie, child))
+
+            if memory_limit and len(parents) > memory_limit:
+                self.search_stats['fallback'] = 'IDA*'
+                yield from self.ida_star_steps()
+                return
+            yield
+
+        self.search_path = path
+
+    """
+      Responsible for the IDA* search itself. It yields after every expanded node so that the search can be run in
+      slices, and stores the found path in search_path when it finishes.
+    """
+
+    def ida_star_steps(self):
+        weight = self.puzzle_variables.get('heuristic_weight', 1)
+        start = tuple(self.board)
+        bound = weight * self.count_conflicts(start)
+        path = None
+
+        if bound == 0:
+            path = [list(start)]
+
+        while path is None and bound < float('inf'):
+            next_bound = float('inf')
+            route = [start]
+            on_route = {start}
+            stack = [self.scored_neighbours(start)]
+            self.search_stats['nodes_expanded'] += 1
+            while stack:
+                h_n, child = next(stack[-1], (None, None))
+                if child is None:
+                    stack.pop()
+                    on_route.discard(route.pop())
+                    continue
+                if child in on_route:
+                    continue
+
+                f_n = len(route) + weight * h_n
+                if h_n == 0:
+                    path = [list(board) for board in route] + [list(child)]
+                    break
+                if f_n > bound:
+                    next_bound = min(next_bound, f_n)
+                    continue
+
+                route.append(child)
+                on_route.add(child)
+                stack.append(self.scored_neighbours(child))
+                self.search_stats['nodes_expanded'] += 1
+                yield
+            bound = next_bound
+
+        self.search_path = path
+
+    """
+      Responsible for ordering the neighbours of a board by their number of conflicts, most promising first.
+    """
+
+    def scored_neighbours(self, board):
+        scored = []
+        for child in self.neighbours(board):
+            scored.append((self.count_conflicts(child), child))
+        scored.sort()
+        return iter(scored)
+
+    def start_search(self, steps):
+        self.search = steps
+        self.search_path = None
+        self.search_stats = {'nodes_expanded': 0, 'elapsed': 0, 'nodes_per_sec': 0}
+
+    """
+      Responsible for running the current search until it finishes or, when a time budget in seconds is given, until
+      the budget is spent. Returns True once the search has finished.
+    """
+
+    def advance_search(self, time_budget=None):
+        start_time = time.perf_counter()
+        finished = False
+        try:
+            while True:
+                next(self.search)
+                if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                    break
+        except StopIteration:
+            finished = True
+            self.search = None
+
+        # Only the time spent searching counts, not the frames drawn in between.
+        self.search_stats['elapsed'] += time.perf_counter() - start_time
+        if self.search_stats['elapsed']:
+            self.search_stats['nodes_per_sec'] = self.search_stats['nodes_expanded'] / self.search_stats['elapsed']
+        return finished
+
+    """
+      Responsible for showing the result of the informed search one move at a time. The search runs in slices of at
+      most time_budget seconds per call (all at once when no budget is given), so a caller drawing frames can keep
+      handling events; every call after the search has finished moves the board along the found path.
+      The running search is a generator and cannot be pickled, so checkpoints are only written while the path is
+      replayed; a run stopped during the search starts it again when resumed.
+    """
+
+    def informed_search_step(self, time_budget=None):
+        if self.search_path is None:
+            if self.search is None:
+                if self.puzzle_variables['Algorithm'] == 'IDA*':
+                    self.start_search(self.ida_star_steps())
+                else:
+                    self.start_search(self.best_first_steps())
+            if not self.advance_search(time_budget):
+                return False
+            if self.search_path is None:
+                # The search space was exhausted without a solution.
+                self.search_path = []
+                return True
+            self.search_path.pop(0)
+
+        if len(self.search_path) == 0:
+            return True
+        self.log.append(self.board)
+        self.visited.add(tuple(self.board))
+        self.board = self.search_path.pop(0)
+        self.g_n += 1
+        if self.checkpoint_due(self.g_n):
+            self.save_checkpoint(self.puzzle_variables['checkpoint_path'])
+        return len(self.search_path) == 0
+
+    """
+      Responsible for the Explicit algorithm. The board already holds the constructed solution.
+    """
+
+    def explicit_algorithm(self):
+        self.board = explicit_solution(self.dimensions, self.board)
+        return True
+
+    """
+      Responsible for the Completion algorithm. Completes the board around the queens pinned by the 'fixed_queens'
+      puzzle variable and returns whether it succeeded. On failure the board is left unchanged and
+      search_stats['completion'] says whether the pins are infeasible or the search gave up.
+    """
+
+    def completion_algorithm(self):
+        try:
+            board = complete_board(self.dimensions, self.puzzle_variables.get('fixed_queens', []), self.rng,
+                                   self.puzzle_variables.get('backtrack_limit', 40))
+        except InfeasiblePlacement:
+            self.search_stats = {'completion': 'Infeasible'}
+            return False
+        if board is None:
+            self.search_stats = {'completion': 'Gave up'}
+            return False
+        self.board = board
+        self.search_stats = {'completion': 'Solved'}
+        return True
+
     """
       Responsible creating the initial generation for the Genetic algorithm.
     """
 
     def initialize_generation(self):
         i = 0
+        # Duplicates are rejected, so the population cannot be larger than the number of distinct boards.
+        if len(self.population_index.boards) + self.puzzle_variables['population_size'] > \
+                self.dimensions ** self.dimensions:
+            raise ValueError('A population of {} boards does not fit in the {} distinct boards for N = {}'.format(
+                self.puzzle_variables['population_size'], self.dimensions ** self.dimensions, self.dimensions))
+        if self.puzzle_variables.get('initial_board') == 'Explicit':
+            # Warm start the population with a known solution.
+            board = explicit_solution(self.dimensions)
+            if board not in self.population_index:
+                self.population_index.add(board)
+                self.population.append(board)
+                i += 1
         while i < self.puzzle_variables['population_size']:
             board = []
             for _ in range(self.dimensions):
-                board.append(random.randint(0, self.dimensions - 1))
+                board.append(self.rng.randint(0, self.dimensions - 1))
 
-            if board not in self.population:
+            if board not in self.population_index:
+                self.population_index.add(board)
                 self.population.append(board)
                 i += 1
+        self.generation_stats = self.population_index.stats()
 
     """
       Responsible for calculating the fitness of each parent in the generation for the Genetic algorithm.
@@ -256,11 +961,11 @@ class PuzzleState:
       Responsible applying crossover between selected parents.
     """
 
-    def crossover(self, p1, p2, new_population):
+    def crossover(self, p1, p2, new_population, new_index=None):
         child1 = []
         child2 = []
         if self.puzzle_variables['crossover'] == 'Single point':
-            crossover_point = random.randint(1, self.dimensions - 1)
+            crossover_point = self.rng.randint(1, self.dimensions - 1)
             for i in range(crossover_point):
                 child1.append(p1[i])
                 child2.append(p2[i])
@@ -270,8 +975,8 @@ class PuzzleState:
                 child2.append(p1[i])
 
         else:
-            crossover_point_1 = random.randint(0, self.dimensions / 2)
-            crossover_point_2 = random.randint(crossover_point_1 + 1, self.dimensions - 1)
+            crossover_point_1 = self.rng.randint(0, self.dimensions // 2)
+            crossover_point_2 = self.rng.randint(crossover_point_1 + 1, self.dimensions - 1)
             for i in range(0, crossover_point_1):
                 child1.append(p1[i])
                 child2.append(p2[i])
@@ -295,18 +1000,24 @@ class PuzzleState:
             new_population.append(child1)
         else:
             new_population.append(child2)
+        if new_index is not None:
+            new_index.add(new_population[-1])
 
-    def mutation(self, new_population, n_recomb):
+    def mutation(self, new_population, n_recomb, new_index=None):
         n_mutation = int(self.puzzle_variables['mutation_rate'] * self.puzzle_variables['population_size'])
         for _ in range(n_mutation):
-            n_bits = random.randint(1, self.dimensions / 2)
+            n_bits = self.rng.randint(1, self.dimensions // 2)
             for _ in range(n_bits):
-                rand_child = random.randint(n_recomb + 1, self.puzzle_variables['population_size'] - 1)
-                rand_gene = random.randint(0, self.puzzle_variables['dimensions'] - 1)
-                rand_row = random.randint(0, self.puzzle_variables['dimensions'] - 1)
+                rand_child = self.rng.randint(n_recomb + 1, self.puzzle_variables['population_size'] - 1)
+                rand_gene = self.rng.randint(0, self.puzzle_variables['dimensions'] - 1)
+                rand_row = self.rng.randint(0, self.puzzle_variables['dimensions'] - 1)
                 while rand_row == new_population[rand_child][rand_gene]:
-                    rand_row = random.randint(0, self.puzzle_variables['dimensions'] - 1)
+                    rand_row = self.rng.randint(0, self.puzzle_variables['dimensions'] - 1)
+                if new_index is not None:
+                    new_index.remove(new_population[rand_child])
                 new_population[rand_child][rand_gene] = rand_row
+                if new_index is not None:
+                    new_index.add(new_population[rand_child])
 
     def genetic_algorithm(self):
         solved = False
@@ -315,19 +1026,22 @@ class PuzzleState:
             return True, self.generation_count
 
         if self.fitted_population[0][0] != 0:
+            new_index = PopulationIndex(self.dimensions)
             recombination_rate = 1 - self.puzzle_variables['crossover_rate']
             n_recomb = int(round(recombination_rate, 1) * self.puzzle_variables['population_size'])
             if self.puzzle_variables['recombination'] == 'With elitism':
                 for elite in self.population[:n_recomb]:
                     new_population.append(elite)
+                    new_index.add(elite)
             else:
                 picked = []
                 i = 0
                 while i < n_recomb:
-                    num = random.randint(0, self.puzzle_variables['population_size'] - 1)
+                    num = self.rng.randint(0, self.puzzle_variables['population_size'] - 1)
                     if num not in picked:
                         picked.append(num)
                         new_population.append(self.population[num])
+                        new_index.add(self.population[num])
                         i += 1
 
             total_population_attacks = 0
@@ -340,7 +1054,7 @@ class PuzzleState:
 
             n_crossover = int(self.puzzle_variables['crossover_rate'] * self.puzzle_variables['population_size'])
             for _ in range(n_crossover):
-                selected = random.choices(population=self.population, k=2, weights=probabilites)
+                selected = self.rng.choices(population=self.population, k=2, weights=probabilites)
                 first_parent = selected[0]
                 second_parent = selected[1]
 
@@ -353,17 +1067,21 @@ class PuzzleState:
                 for i in range(self.dimensions):
                     p2.append(second_parent[i])
 
-                self.crossover(p1, p2, new_population)
+                self.crossover(p1, p2, new_population, new_index)
 
-            self.mutation(new_population, n_recomb)
+            self.mutation(new_population, n_recomb, new_index)
 
             self.population = new_population
+            self.population_index = new_index
+            self.generation_stats = self.population_index.stats()
             self.fitted_population = []
             self.determine_fitness()
             self.fitted_population.sort()
 
             self.board = self.fitted_population[0][1]
             self.generation_count += 1
+            if self.checkpoint_due(self.generation_count):
+                self.save_checkpoint(self.puzzle_variables['checkpoint_path'])
             if self.fitted_population[0][0] == 0:
                 solved = True
 
@@ -372,3 +1090,73 @@ class PuzzleState:
             self.board = self.fitted_population[0][1]
 
         return solved, self.generation_count
+
+    """
+      Responsible for deciding whether a checkpoint should be written at the given step or generation.
+    """
+
+    def checkpoint_due(self, count):
+        interval = self.puzzle_variables.get('checkpoint_interval', 0)
+        if not interval or not self.puzzle_variables.get('checkpoint_path'):
+            return False
+        return count % interval == 0
+
+    """
+      Responsible for writing the full puzzle state (boards, populations, counters and RNG state) to a binary
+      checkpoint file. The A* log only grows, so just its new entries are appended to a '.log' file next to it,
+      which keeps every checkpoint proportional to the work done since the previous one.
+    """
+
+    def save_checkpoint(self, path):
+        self.append_log(path + '.log')
+        state = {
+            'puzzle_variables': self.puzzle_variables,
+            'rng_state': self.rng.getstate(),
+            'log_length': len(self.log),
+        }
+        for attribute in CHECKPOINT_ATTRIBUTES:
+            state[attribute] = getattr(self, attribute)
+        # Write next to the target and swap it in, so an interrupted write never leaves a truncated checkpoint.
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def log_typecode(self):
+        return 'B' if self.dimensions <= 256 else 'H'
+
+    def append_log(self, log_path):
+        rows = array(self.log_typecode())
+        for board in self.log[self.log_saved:]:
+            rows.extend(board)
+        with open(log_path, 'ab' if self.log_saved else 'wb') as f:
+            rows.tofile(f)
+        self.log_saved = len(self.log)
+
+    """
+      Responsible for rebuilding a puzzle state from a checkpoint file. The resumed run continues exactly as the
+      original one would have.
+    """
+
+    @classmethod
+    def load_checkpoint(cls, path):
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+
+        ps = cls.__new__(cls)
+        ps.reset_state(state['puzzle_variables'])
+        for attribute in CHECKPOINT_ATTRIBUTES:
+            setattr(ps, attribute, state[attribute])
+        ps.rng.setstate(state['rng_state'])
+
+        # Entries appended after this checkpoint was written are dropped, so later appends stay aligned.
+        rows = array(ps.log_typecode())
+        with open(path + '.log', 'r+b') as f:
+            rows.fromfile(f, state['log_length'] * ps.dimensions)
+            f.truncate(rows.itemsize * len(rows))
+        for start in range(0, len(rows), ps.dimensions):
+            ps.log.append(rows[start:start + ps.dimensions].tolist())
+        ps.log_saved = len(ps.log)
+
+        ps.rebuild_indexes()
+        return ps
@@ -2,21 +2,25 @@
 This the main driver file. It will be responsible for handling user input and displaying the current PuzzleState object.
 """
 
-import pygame as p
+import argparse
+import os
 import sys
-import pygame_gui as p_gui
+import time
 
-from PuzzleEngine import PuzzleState
+import_start = time.perf_counter()
+import pygame as p
+import_pygame = time.perf_counter() - import_start
 
-p.init()
 width = height = 512
 screen_width = width + 300
 screen_height = height + 200
 
-p.display.set_caption('N-Queen Puzzle')
-screen = p.display.set_mode((screen_width, screen_height))
-manager = p_gui.UIManager((screen_width, screen_height))
-clock = p.time.Clock()
+# Created by startup() so that importing this module does not open a window. pygame_gui is imported there as well,
+# so that its import time is measured as a startup phase.
+p_gui = None
+screen = None
+manager = None
+clock = None
 
 dark_blue = (33, 40, 45)
 white = (255, 255, 255)
@@ -25,13 +29,89 @@ max_fpx = 15  # For queen movement
 
 gui_components = {}
 
-main_font = p.font.SysFont(None, 90, bold=True)
-font_sub = p.font.SysFont(None, 70, bold=True)
-font_opt = p.font.SysFont(None, 40, bold=True)
+# Fonts and images are loaded on first use and cached, so each screen only pays for what it draws.
+font_sizes = {'main': 90, 'sub': 70, 'opt': 40}
+fonts = {}
+images = {}
+
+# Time spent in each startup phase, reported after the first frame when --profile-startup is given.
+startup_phases = [('import pygame', import_pygame)]
+profile_startup = False
+
+preset_path = 'tuned_preset.json'  # Written by PuzzleTuner.py
 
 puzzle_variable = {'dimensions': 8, 'Algorithm': 'A*', 'crossover': 'Single point', 'crossover_rate': 0.9,
                    'mutation_rate': 0.1, "recombination": 'With elitism',
-                   'population_size': 100, 'n_generations': 250}
+                   'population_size': 100, 'n_generations': 250, 'heuristic_weight': 3, 'memory_limit': None,
+                   'fixed_queens': []}
+
+
+"""
+Responsible for initialising only what the main menu needs and recording the time spent in each phase.
+"""
+
+
+def startup():
+    global p_gui, screen, manager, clock
+
+    start_time = time.perf_counter()
+    import pygame_gui as p_gui
+    startup_phases.append(('import pygame_gui', time.perf_counter() - start_time))
+
+    start_time = time.perf_counter()
+    # Only the display and font modules are needed; p.init() would also probe audio and joysticks.
+    p.display.init()
+    p.font.init()
+    startup_phases.append(('pygame init', time.perf_counter() - start_time))
+
+    start_time = time.perf_counter()
+    p.display.set_caption('N-Queen Puzzle')
+    screen = p.display.set_mode((screen_width, screen_height))
+    clock = p.time.Clock()
+    startup_phases.append(('display', time.perf_counter() - start_time))
+
+    start_time = time.perf_counter()
+    manager = p_gui.UIManager((screen_width, screen_height))
+    startup_phases.append(('ui manager', time.perf_counter() - start_time))
+
+
+"""
+Responsible for printing the startup phases.
+"""
+
+
+def report_startup():
+    total = 0
+    for phase, elapsed in startup_phases:
+        print('{:<20}{:8.1f} ms'.format(phase, elapsed * 1000))
+        total += elapsed
+    print('{:<20}{:8.1f} ms'.format('total', total * 1000))
+
+
+"""
+Responsible for creating a font the first time it is used. The default font is opened directly: SysFont() would
+scan every installed font before falling back to it.
+"""
+
+
+def get_font(name):
+    if name not in fonts:
+        fonts[name] = p.font.Font(None, font_sizes[name])
+        fonts[name].set_bold(True)
+    return fonts[name]
+
+
+"""
+Responsible for loading a queen image ('wQ' or 'bQ') the first time it is used and caching it for each size.
+"""
+
+
+def get_queen_image(size, piece='wQ'):
+    if (piece, size) not in images:
+        if piece not in images:
+            images[piece] = p.image.load('images/' + piece + '.png')
+        images[(piece, size)] = p.transform.scale(images[piece], (size, size))
+    return images[(piece, size)]
 
 
 def draw_text(text, font, color, surface, x, y):
@@ -46,11 +126,15 @@ Responsible for managing the main menu UI elements and its controls.
 """
 
 
-def main_menu():
+def main_menu(resume_path=None):
+    start_time = time.perf_counter()
     draw_main_menu_ui()
+    startup_phases.append(('main menu', time.perf_counter() - start_time))
+    if resume_path:
+        puzzle_screen(resume_path)
+    first_frame = True
+    start_time = time.perf_counter()
     running = True
-    ps = PuzzleState(puzzle_variable)
-    ps.initialize_generation()
     while running:
         for e in p.event.get():
             if e.type == p.QUIT:
@@ -75,6 +159,11 @@ def main_menu():
         manager.draw_ui(screen)
         clock.tick(max_fpx)
         p.display.update()
+        if first_frame:
+            first_frame = False
+            startup_phases.append(('first frame', time.perf_counter() - start_time))
+            if profile_startup:
+                report_startup()
 
 
 """
@@ -86,8 +175,7 @@ def settings_menu():
     running = True
     manager.clear_and_reset()
     draw_settings_ui()
-    if puzzle_variable['Algorithm'] == 'Genetic':
-        genetic_parameters_ui()
+    draw_algorithm_parameters_ui()
 
     while running:
         screen.fill(dark_blue)
@@ -107,11 +195,9 @@ def settings_menu():
                 if e.user_type == p_gui.UI_DROP_DOWN_MENU_CHANGED:
                     if e.ui_element == gui_components['algorithm']:
                         puzzle_variable['Algorithm'] = gui_components['algorithm'].selected_option
-                        if puzzle_variable['Algorithm'] == 'Genetic':
-                            genetic_parameters_ui()
-                        else:
-                            manager.clear_and_reset()
-                            draw_settings_ui()
+                        manager.clear_and_reset()
+                        draw_settings_ui()
+                        draw_algorithm_parameters_ui()
                     elif e.ui_element == gui_components['board_size']:
                         puzzle_variable['dimensions'] = int(gui_components['board_size'].selected_option)
                     elif e.ui_element == gui_components['crossover']:
@@ -128,21 +214,42 @@ def settings_menu():
                             if puzzle_variable['Algorithm'] == 'Genetic':
                                 puzzle_variable['population_size'] = int(gui_components['population_size'].text)
                                 puzzle_variable['n_generations'] = int(gui_components['n_generations'].text)
+                                if puzzle_variable['population_size'] > \
+                                        puzzle_variable['dimensions'] ** puzzle_variable['dimensions']:
+                                    raise ValueError('Population larger than the number of distinct boards')
+                            elif puzzle_variable['Algorithm'] in ['Best-first A*', 'IDA*']:
+                                heuristic_weight = float(gui_components['heuristic_weight'].text)
+                                if heuristic_weight < 1:
+                                    raise ValueError('A heuristic weight below 1 only expands more nodes')
+                                puzzle_variable['heuristic_weight'] = heuristic_weight
+                                if puzzle_variable['Algorithm'] == 'Best-first A*':
+                                    memory_limit = gui_components['memory_limit'].text.strip()
+                                    puzzle_variable['memory_limit'] = int(memory_limit) if memory_limit else None
                             running = False
                             manager.clear_and_reset()
                             draw_main_menu_ui()
                         except:
                             manager.clear_and_reset()
                             draw_settings_ui()
+                            draw_algorithm_parameters_ui()
                     elif e.ui_element == gui_components['reset_button']:
                         manager.clear_and_reset()
                         init_vars = {'dimensions': 8, 'Algorithm': 'A*', 'crossover': 'Single point',
                                      'crossover_rate': 0.9,
                                      'mutation_rate': 0.1, "recombination": 'With elitism',
-                                     'population_size': 100, 'n_generations': 250}
+                                     'population_size': 100, 'n_generations': 250, 'heuristic_weight': 3,
+                                     'memory_limit': None}
                         for var in init_vars:
                             puzzle_variable[var] = init_vars[var]
                         draw_settings_ui()
+                    elif e.ui_element == gui_components['preset_button']:
+                        from PuzzleEngine import load_preset
+                        if os.path.exists(preset_path):
+                            load_preset(preset_path, puzzle_variable)
+                            puzzle_variable['Algorithm'] = 'Genetic'
+                        manager.clear_and_reset()
+                        draw_settings_ui()
+                        draw_algorithm_parameters_ui()
 
         manager.update(max_fpx)
         manager.draw_ui(screen)
@@ -155,10 +262,24 @@ Responsible for displaying the puzzle board, queens, number of steps, and elapse
 """
 
 
-def puzzle_screen():
+def puzzle_screen(resume_path=None):
     speed = 10
+    from PuzzleEngine import PuzzleState
+
     p.display.set_mode((width + 300, height + 100))
-    ps = PuzzleState(puzzle_variable)
+    if resume_path:
+        ps = PuzzleState.load_checkpoint(resume_path)
+        # The screen and any later runs follow the settings the checkpointed run was started with.
+        puzzle_variable.update(ps.puzzle_variables)
+        ps.puzzle_variables = puzzle_variable
+    else:
+        # Queens pinned by clicking on the board for the Completion algorithm.
+        puzzle_variable['fixed_queens'] = []
+        # N may have been lowered after the population size was saved; the population must fit in the N^N boards.
+        if puzzle_variable['Algorithm'] == 'Genetic':
+            puzzle_variable['population_size'] = min(puzzle_variable['population_size'],
+                                                     puzzle_variable['dimensions'] ** puzzle_variable['dimensions'])
+        ps = PuzzleState(puzzle_variable)
     running = True
     paused = True
     solved = False
@@ -166,9 +287,13 @@ def puzzle_screen():
 
     draw_board()
     draw_puzzle_ui()
-    number_of_steps = 0
+    # Non zero only when a checkpoint was resumed.
+    cur_gen = ps.generation_count
+    if puzzle_variable['Algorithm'] == 'Genetic':
+        number_of_steps = cur_gen * puzzle_variable['dimensions']
+    else:
+        number_of_steps = ps.g_n
 
-    cur_gen = 0
     start_time = 0
     counting_time = 0
 
@@ -177,6 +302,20 @@ def puzzle_screen():
             if puzzle_variable['Algorithm'] == 'A*':
                 solved = paused = ps.astar_algorithm()
                 number_of_steps += 1
+            elif puzzle_variable['Algorithm'] == 'Explicit':
+                solved = paused = ps.explicit_algorithm()
+                number_of_steps += 1
+            elif puzzle_variable['Algorithm'] == 'Completion':
+                # A failed completion pauses too, so the pins can be changed before running again.
+                solved = ps.completion_algorithm()
+                paused = True
+                gui_components['toggle_button'].set_text('Run')
+                gui_components['return_button'].enable()
+                number_of_steps += 1
+            elif puzzle_variable['Algorithm'] in ['Best-first A*', 'IDA*']:
+                # The search gets most of each frame, so the window keeps handling events while it runs.
+                solved = paused = ps.informed_search_step(0.8 / speed)
+                number_of_steps = ps.g_n
             else:
                 solved, n_gen = ps.genetic_algorithm()
                 number_of_steps += puzzle_variable['dimensions']
@@ -187,8 +326,8 @@ def puzzle_screen():
             gui_components['return_button'].enable()
 
         screen.fill(dark_blue)
-        draw_text('Step:', font_opt, white, screen, 550, 50)
-        draw_text(str(number_of_steps), font_opt, white, screen, 650, 50)
+        draw_text('Step:', get_font('opt'), white, screen, 550, 50)
+        draw_text(str(number_of_steps), get_font('opt'), white, screen, 650, 50)
 
         minutes = int(counting_time / 60000)
         seconds = int((counting_time % 60000) / 1000)
@@ -201,13 +340,20 @@ def puzzle_screen():
 
             shown_1 = '{:02}'.format(minutes)
             shown_2 = '{:02}'.format(seconds)
-        draw_text('Time:', font_opt, white, screen, 550, 150)
+        draw_text('Time:', get_font('opt'), white, screen, 550, 150)
         draw_text(shown_1 + '.' + shown_2 + letter,
-                  font_opt, white, screen, 650, 150)
+                  get_font('opt'), white, screen, 650, 150)
 
         if puzzle_variable['Algorithm'] == 'Genetic':
-            draw_text('Gen:', font_opt, white, screen, 550, 250)
-            draw_text(str(cur_gen), font_opt, white, screen, 650, 250)
+            draw_text('Gen:', get_font('opt'), white, screen, 550, 250)
+            draw_text(str(cur_gen), get_font('opt'), white, screen, 650, 250)
+            draw_text('Unique:', get_font('opt'), white, screen, 530, 350)
+            draw_text(str(ps.generation_stats['unique']), get_font('opt'), white, screen, 650, 350)
+        elif 'completion' in ps.search_stats:
+            draw_text(ps.search_stats['completion'], get_font('opt'), white, screen, 550, 250)
+        elif 'nodes_per_sec' in ps.search_stats:
+            draw_text('Nodes/s:', get_font('opt'), white, screen, 520, 250)
+            draw_text(str(int(ps.search_stats['nodes_per_sec'])), get_font('opt'), white, screen, 650, 250)
 
         draw_board()
         draw_queens(ps)
@@ -226,6 +372,9 @@ def puzzle_screen():
                         manager.clear_and_reset()
                         draw_main_menu_ui()
                         running = False
+            if e.type == p.MOUSEBUTTONDOWN and puzzle_variable['Algorithm'] == 'Completion' and paused and \
+                    not solved:
+                toggle_pin(ps, e.pos)
             manager.process_events(e)
             if e.type == p.USEREVENT:
                 if e.user_type == p_gui.UI_BUTTON_PRESSED:
@@ -260,11 +409,11 @@ Responsible for drawing main menu UI elements.
 
 def draw_main_menu_ui():
     screen.fill(dark_blue)
-    q_image = p.transform.scale(p.image.load('images/wQ.png'), (100, 100))
+    q_image = get_queen_image(100)
     screen.blit(q_image,
                 p.Rect(350, 50, 300, 300))
 
-    draw_text('N-Queen Puzzle', main_font, white, screen, 130, 160)
+    draw_text('N-Queen Puzzle', get_font('main'), white, screen, 130, 160)
 
     gui_components['start_button'] = p_gui.elements.UIButton(
         text='Start',
@@ -294,11 +443,12 @@ def draw_settings_ui():
     p_gui.elements.UILabel(relative_rect=p.Rect((x_label, 100), (label_width, label_height)),
                            text='Algorithm:',
                            manager=manager)
-    gui_components['algorithm'] = p_gui.elements.UIDropDownMenu(options_list=['A*', 'Genetic'],
-                                                                starting_option=puzzle_variable['Algorithm'],
-                                                                relative_rect=p.Rect((x_drop, 110),
-                                                                                     (drop_width, drop_height)),
-                                                                manager=manager)
+    gui_components['algorithm'] = p_gui.elements.UIDropDownMenu(
+        options_list=['A*', 'Best-first A*', 'IDA*', 'Genetic', 'Explicit', 'Completion'],
+        starting_option=puzzle_variable['Algorithm'],
+        relative_rect=p.Rect((x_drop, 110), (drop_width, drop_height)),
+        manager=manager
+    )
 
     p_gui.elements.UILabel(relative_rect=p.Rect((x_label, 170), (label_width, label_height)),
                            text='N:',
@@ -325,6 +475,61 @@ def draw_settings_ui():
         relative_rect=p.Rect((650, 650), (150, 40)),
         manager=manager
     )
+    gui_components['preset_button'] = p_gui.elements.UIButton(
+        text='Load preset',
+        relative_rect=p.Rect((650, 550), (150, 40)),
+        manager=manager
+    )
+
+
+"""
+Responsible for drawing the parameters of the selected algorithm, if it has any.
+"""
+
+
+def draw_algorithm_parameters_ui():
+    if puzzle_variable['Algorithm'] == 'Genetic':
+        genetic_parameters_ui()
+    elif puzzle_variable['Algorithm'] in ['Best-first A*', 'IDA*']:
+        search_parameters_ui()
+
+
+"""
+Responsible for drawing the best-first A* and IDA* parameters when either is selected. Both searches are weighted:
+f = g + weight * h, so a weight above 1 finds a solution much faster but not along the shortest path.
+"""
+
+
+def search_parameters_ui():
+    x_label = 50
+    label_width = 200
+    label_height = 50
+
+    x_entries = 250
+    entries_width = 350
+    entries_height = 40
+    p_gui.elements.UILabel(relative_rect=p.Rect((x_label, 240), (label_width, label_height)),
+                           text='Heuristic weight:',
+                           manager=manager,
+                           )
+    gui_components['heuristic_weight'] = p_gui.elements.UITextEntryLine(
+        relative_rect=p.Rect((x_entries, 250), (entries_width, entries_height)),
+        manager=manager,
+    )
+    gui_components['heuristic_weight'].set_text(str(puzzle_variable['heuristic_weight']))
+
+    if puzzle_variable['Algorithm'] != 'Best-first A*':
+        return
+    p_gui.elements.UILabel(relative_rect=p.Rect((x_label, 310), (label_width, label_height)),
+                           text='Memory limit (nodes):',
+                           manager=manager,
+                           )
+    gui_components['memory_limit'] = p_gui.elements.UITextEntryLine(
+        relative_rect=p.Rect((x_entries, 320), (entries_width, entries_height)),
+        manager=manager,
+    )
+    if puzzle_variable['memory_limit']:
+        gui_components['memory_limit'].set_text(str(puzzle_variable['memory_limit']))
 
 
 """
@@ -415,9 +620,9 @@ Responsible for drawing settings menu decorations.
 
 
 def draw_settings_text():
-    draw_text('Settings', font_sub, white, screen, 290, 30)
+    draw_text('Settings', get_font('sub'), white, screen, 290, 30)
 
-    q_image = p.transform.scale(p.image.load('images/wQ.png'), (100, 100))
+    q_image = get_queen_image(100)
     screen.blit(q_image,
                 p.Rect(0, 0, 300, 300))
 
@@ -450,13 +655,39 @@ Responsible for the drawing of the queens on the board using the PuzzleState.boa
 def draw_queens(ps):
     dimensions = puzzle_variable['dimensions']
     sq_size = height // dimensions  # Size of each square
-    q_image = p.transform.scale(p.image.load('images/wQ.png'), (sq_size, sq_size))  # Queen image
+    q_image = get_queen_image(sq_size)  # Queen image
+    pinned_image = get_queen_image(sq_size, 'bQ')  # Queens pinned for the Completion algorithm
+    pinned = dict(puzzle_variable['fixed_queens'])
 
     for column in range(dimensions):
-        screen.blit(q_image,
+        image = pinned_image if pinned.get(column) == ps.board[column] else q_image
+        screen.blit(image,
                     p.Rect(column * sq_size, ps.board[column] * sq_size, sq_size, sq_size))
 
 
+"""
+Responsible for pinning the queen of the clicked square for the Completion algorithm. Clicking a pinned queen
+unpins it.
+"""
+
+
+def toggle_pin(ps, pos):
+    dimensions = puzzle_variable['dimensions']
+    sq_size = height // dimensions  # Size of each square
+    column = pos[0] // sq_size
+    row = pos[1] // sq_size
+    if column >= dimensions or row >= dimensions:
+        return
+
+    pinned = dict(puzzle_variable['fixed_queens'])
+    if pinned.get(column) == row:
+        del pinned[column]
+    else:
+        pinned[column] = row
+        ps.board[column] = row
+    puzzle_variable['fixed_queens'] = list(pinned.items())
+
+
 """
 Responsible for drawing the puzzle screen controls.
 """
@@ -486,4 +717,17 @@ def draw_puzzle_ui():
 
 
 if __name__ == '__main__':
-    main_menu()
+    parser = argparse.ArgumentParser(description='Solve the N-Queen puzzle step by step.')
+    parser.add_argument('--profile-startup', action='store_true', help='print the time spent in each startup phase')
+    parser.add_argument('--checkpoint', help='write the puzzle state to this file while A*, the informed searches '
+                                             'or the genetic algorithm run')
+    parser.add_argument('--checkpoint-interval', type=int, default=50,
+                        help='steps or generations between checkpoints')
+    parser.add_argument('--resume', help='open the puzzle screen on the state saved in this checkpoint file')
+    args = parser.parse_args()
+    profile_startup = args.profile_startup
+    if args.checkpoint:
+        puzzle_variable['checkpoint_path'] = args.checkpoint
+        puzzle_variable['checkpoint_interval'] = args.checkpoint_interval
+    startup()
+    main_menu(args.resume)
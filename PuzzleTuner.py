@@ -0,0 +1,175 @@
+"""
+This is the genetic algorithm tuner. It searches the genetic parameters with random search and successive halving,
+evaluates every candidate on a process pool with several seeds, writes a ranked table of the candidates by solve
+rate and median time-to-solution and saves the best one as a preset that PuzzleState and the settings menu can load.
+"""
+
+import argparse
+import csv
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PuzzleEngine import PuzzleState
+
+rates_list = [i / 10 for i in range(1, 10)]
+
+search_space = {'crossover': ['Single point', 'Multi-point'],
+                'crossover_rate': rates_list,
+                'mutation_rate': rates_list,
+                'recombination': ['With elitism', 'Without elitism'],
+                'population_size': [50, 100, 200, 400]}
+
+default_n_generations = 250
+
+"""
+Responsible for drawing a random candidate configuration from the search space.
+"""
+
+
+def sample_config(rng):
+    config = {}
+    for var in search_space:
+        config[var] = rng.choice(search_space[var])
+    config['n_generations'] = default_n_generations
+    return config
+
+
+"""
+Responsible for running the genetic algorithm once. Returns whether a solution was found within the generations
+limit and the time it took.
+"""
+
+
+def evaluate(config, dimensions, seed):
+    puzzle_variables = dict(config)
+    puzzle_variables['dimensions'] = dimensions
+    puzzle_variables['Algorithm'] = 'Genetic'
+    puzzle_variables['seed'] = seed
+
+    start_time = time.perf_counter()
+    ps = PuzzleState(puzzle_variables)
+    solved = False
+    while not solved:
+        solved, _ = ps.genetic_algorithm()
+    elapsed = time.perf_counter() - start_time
+
+    return ps.fitted_population[0][0] == 0, elapsed
+
+
+"""
+Responsible for evaluating every candidate over all board sizes and seeds on the process pool.
+Returns the (solve rate, median time of the solved runs) score of each candidate. The median is infinite when no
+run was solved. A population larger than the N^N distinct boards cannot be built, so those runs count as unsolved.
+"""
+
+
+def evaluate_candidates(pool, candidates, dimensions_range, seeds):
+    jobs = []
+    for config in candidates:
+        futures = []
+        for dimensions in dimensions_range:
+            if config['population_size'] > dimensions ** dimensions:
+                futures += [None] * len(seeds)
+                continue
+            for seed in seeds:
+                futures.append(pool.submit(evaluate, config, dimensions, seed))
+        jobs.append(futures)
+
+    scores = []
+    for futures in jobs:
+        runs = []
+        for future in futures:
+            runs.append((False, 0) if future is None else future.result())
+        solved_times = [elapsed for solved, elapsed in runs if solved]
+        median = statistics.median(solved_times) if solved_times else float('inf')
+        scores.append((len(solved_times) / len(runs), median))
+    return scores
+
+
+"""
+Responsible for the successive halving search. Every rung evaluates the surviving candidates with more seeds and
+keeps the best 1/eta of them, ranked by solve rate and then by median time of the solved runs.
+Returns (solve_rate, median, n_seeds, config) rows, best first.
+"""
+
+
+def tune(dimensions_range, n_candidates=16, n_seeds=3, eta=2, workers=None, search_seed=None):
+    rng = random.Random(search_seed)
+    candidates = [sample_config(rng) for _ in range(n_candidates)]
+    results = {}
+    seed_count = n_seeds
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while candidates:
+            scores = evaluate_candidates(pool, candidates, dimensions_range, range(seed_count))
+            rung = sorted(range(len(candidates)), key=lambda idx: (-scores[idx][0], scores[idx][1]))
+            for idx in rung:
+                solve_rate, median = scores[idx]
+                results[json.dumps(candidates[idx], sort_keys=True)] = (solve_rate, median, seed_count,
+                                                                        candidates[idx])
+
+            if len(candidates) == 1:
+                break
+            candidates = [candidates[idx] for idx in rung[:max(1, len(candidates) // eta)]]
+            seed_count *= eta
+
+    # Candidates that survived more rungs were measured with more seeds, so they rank ahead of the ones dropped early.
+    return sorted(results.values(), key=lambda row: (-row[2], -row[0], row[1]))
+
+
+"""
+Responsible for writing the ranked table of configurations.
+"""
+
+
+def write_table(path, ranking):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['rank', 'solve_rate', 'median_time_s', 'seeds'] + list(search_space) + ['n_generations'])
+        for rank, (solve_rate, median, seed_count, config) in enumerate(ranking, start=1):
+            row = [rank, '{:.2f}'.format(solve_rate), '{:.4f}'.format(median), seed_count]
+            for var in list(search_space) + ['n_generations']:
+                row.append(config[var])
+            writer.writerow(row)
+
+
+"""
+Responsible for saving the best configuration as a preset.
+"""
+
+
+def write_preset(path, config):
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tune the genetic algorithm parameters for a range of board sizes.')
+    parser.add_argument('--min-n', type=int, default=8)
+    parser.add_argument('--max-n', type=int, default=8)
+    parser.add_argument('--candidates', type=int, default=16)
+    parser.add_argument('--seeds', type=int, default=3)
+    parser.add_argument('--eta', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--search-seed', type=int, default=None)
+    parser.add_argument('--table', default='tuning_results.csv')
+    parser.add_argument('--preset', default='tuned_preset.json')
+    args = parser.parse_args()
+
+    ranking = tune(range(args.min_n, args.max_n + 1), args.candidates, args.seeds, args.eta, args.workers,
+                   args.search_seed)
+    write_table(args.table, ranking)
+    solved_rows = [row for row in ranking if row[0] > 0]
+    if not solved_rows:
+        print('No candidate solved any run; no preset written.')
+        return
+    solve_rate, median, _, config = solved_rows[0]
+    write_preset(args.preset, config)
+    print('Best solve rate: {:.0%}, median time-to-solution: {:.4f}s'.format(solve_rate, median))
+
+
+if __name__ == '__main__':
+    main()